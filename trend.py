@@ -1,26 +1,106 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import orjson
 import csv
 import argparse
+import functools
+import os
+import queue
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import quote_plus
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
 
 # Define exclusion patterns - easily customizable
 EXCLUSION_PATTERNS = [
-#--- General Exclusions ---
-الصفحة_الرئيسة
-خاص:بحث
+    #--- General Exclusions ---
+    "الصفحة_الرئيسة",
+    "خاص:بحث",
 ]
 
 
+# Transient failures from Wikimedia are retried with exponential backoff
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+)
+
+
+# Wikipedia API titles use underscores in place of spaces
+_TITLE_TRANSLATION = str.maketrans('_', ' ')
+
+
+# Shared HTTP session so repeated requests reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+# Accept-Encoding is left at the requests default: it offers Brotli (smaller than gzip)
+# only when the brotli package is installed, i.e. when urllib3 can actually decode it.
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=HTTP_RETRY))
+
+# Each Al Jazeera search needs a whole headless Firefox, so at most this many run in parallel
+MAX_BROWSERS = 4
+# Firefox disk cache kept between runs so repeated searches reuse the search app's assets.
+# Browsers claim one of FIREFOX_CACHE_SLOTS numbered directories under it with a lock, so
+# concurrent runs never share one; if none is free, a throwaway directory is used instead.
+FIREFOX_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'wikitrend-ffcache')
+FIREFOX_CACHE_SLOTS = 2 * MAX_BROWSERS
+# Al Jazeera coverage results are reused across runs until they are this old
+COVERAGE_CACHE_FILE = 'aljazeera_cache.json'
+COVERAGE_CACHE_MAX_AGE = timedelta(days=7)
+# Returned when a search timed out without confirming results. It is reported as coverage,
+# like before, but not cached, since a slow or broken page produces the same outcome.
+COVERAGE_INFERRED = 'inferred'
+
+
+def get_session():
+    """Returns the shared requests session used for all HTTP calls."""
+    return _SESSION
+
+
+def compile_exclusion_patterns(exclusion_patterns):
+    """
+    Combines exclusion patterns into a single compiled regular expression, so each
+    article title is scanned once instead of once per pattern.
+    
+    Patterns are matched against raw Wikipedia titles, which use underscores
+    instead of spaces, so spaces in a pattern are normalized the same way and
+    duplicate patterns are dropped.
+    
+    Args:
+        exclusion_patterns (list): List of strings to exclude.
+    
+    Returns:
+        re.Pattern: A pattern matching any of the exclusion strings.
+    """
+    # Compiled patterns are cached, so repeated should_exclude_article() calls are cheap
+    return _compile_exclusions(tuple(exclusion_patterns or ()))
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_exclusions(exclusion_patterns):
+    patterns = dict.fromkeys(pattern.replace(' ', '_') for pattern in exclusion_patterns)
+    if not patterns:
+        return re.compile(r'(?!)')  # Never matches
+    return re.compile('|'.join(re.escape(pattern) for pattern in patterns))
+
+
+# Compile the default exclusions once at load time
+compile_exclusion_patterns(EXCLUSION_PATTERNS)
+
+
 def should_exclude_article(article_title, exclusion_patterns):
     """
     Checks if an article title contains any of the exclusion patterns.
@@ -32,10 +112,7 @@ def should_exclude_article(article_title, exclusion_patterns):
     Returns:
         bool: True if the article should be excluded, False otherwise.
     """
-    for pattern in exclusion_patterns:
-        if pattern in article_title:
-            return True
-    return False
+    return compile_exclusion_patterns(exclusion_patterns).search(article_title) is not None
 
 
 def get_top_wikipedia_arabic_topics(date_str, top_n=10, exclusion_patterns=None):
@@ -62,26 +139,24 @@ def get_top_wikipedia_arabic_topics(date_str, top_n=10, exclusion_patterns=None)
         
         url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/ar.wikipedia/all-access/{year}/{month}/{day}"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers)
+        response = get_session().get(url, timeout=10)
         response.raise_for_status()
         
-        data = response.json()
-        
-        # Filter articles using the exclusion function
-        articles = [
-            item for item in data.get('items', [])[0].get('articles', [])
-            if not should_exclude_article(item['article'], exclusion_patterns)
-        ]
+        # orjson parses the raw UTF-8 bytes directly, skipping the text decode step
+        data = orjson.loads(response.content)
         
+        # Filter the raw underscore titles with a single compiled pattern covering all exclusions,
+        # stopping as soon as top_n articles have been kept
+        exclusion_re = compile_exclusion_patterns(exclusion_patterns)
         top_articles = []
-        for item in articles[:top_n]:
+        for item in data.get('items', [])[0].get('articles', []):
+            if len(top_articles) == top_n:
+                break
+            if exclusion_re.search(item['article']):
+                continue
             top_articles.append({
                 'rank': item['rank'],
-                'article': item['article'].replace('_', ' '),
+                'article': item['article'].translate(_TITLE_TRANSLATION),
                 'views': item['views']
             })
             
@@ -91,7 +166,7 @@ def get_top_wikipedia_arabic_topics(date_str, top_n=10, exclusion_patterns=None)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching Wikipedia data: {e}")
         return []
-    except (IndexError, KeyError) as e:
+    except (orjson.JSONDecodeError, IndexError, KeyError) as e:
         print(f"Error parsing Wikipedia API response for {date_str}. Data might not be available yet. Details: {e}")
         return []
 
@@ -105,8 +180,16 @@ def search_aljazeera_with_selenium(topic, driver):
         driver: The Selenium WebDriver instance.
 
     Returns:
-        bool: True if search results are found, False otherwise.
+        bool: True if search results are found, False if the no-results marker is found,
+            COVERAGE_INFERRED if the wait timed out without result articles on the page,
+            or None if the search failed.
     """
+    # Selenium is imported lazily so importing this module stays cheap
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     exact_phrase_query = f'"{topic}"'
     query = quote_plus(exact_phrase_query)
     url = f"https://www.aljazeera.net/search/{query}"
@@ -114,54 +197,56 @@ def search_aljazeera_with_selenium(topic, driver):
 
     try:
         driver.get(url)
-        # Wait up to 10 seconds for the search results container to appear.
-        # Wait for EITHER the success element OR the no-results element.
+        # Wait up to 10 seconds for the no-results marker to appear.
+        # A single selector lookup answers the question: if the wait succeeds the
+        # marker exists, so no second find_elements round-trip to the browser is needed.
         WebDriverWait(driver, 10).until(
-            EC.any_of(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".search-results__no-results"))
-            )
+            EC.presence_of_element_located((By.CSS_SELECTOR, ".search-results__no-results"))
         )
-        
-        # Now that we've waited, check if there are any <article> elements inside the container.
-        #results_container = driver.find_element(By.CLASS_NAME, "gc-container")
-        #articles = results_container.find_elements(By.TAG_NAME, "article")
-        #return len(articles) > 0
-
-        # Now, check which element was actually found.
-        if driver.find_elements(By.CSS_SELECTOR, ".search-results__no-results"):
-            print(f"Confirmed: No results for '{topic}'.")
-            return False
-        else:
-            return True
+        print(f"Confirmed: No results for '{topic}'.")
+        return False
             
     except TimeoutException:
-        # This will be triggered if the .search-summary__query element does not appear.
-        print(f"Results found for '{topic}' on Al Jazeera.")
-        return True
+        # No no-results marker appeared. Only treat it as confirmed if result articles are on
+        # the page, since a slow or half-rendered page also times out.
+        try:
+            if driver.find_elements(By.CSS_SELECTOR, ".gc-container article"):
+                print(f"Results found for '{topic}' on Al Jazeera.")
+                return True
+        except WebDriverException as e:
+            print(f"A browser error occurred while searching for '{topic}': {e}")
+            return None
+        print(f"No results marker for '{topic}', but no result articles either. Assuming coverage.")
+        return COVERAGE_INFERRED
     except WebDriverException as e:
         print(f"A browser error occurred while searching for '{topic}': {e}")
-        return False
+        return None
 
 
 def save_to_json(data, filename):
     """Saves data to a JSON file with UTF-8 encoding."""
     print(f"Saving results to {filename}...")
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    # orjson serializes straight to UTF-8 bytes, so the file is opened in binary mode
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     print("JSON file saved successfully.")
 
 
 def export_to_csv(data, filename):
-    """Exports a list of dictionaries to a CSV file."""
+    """Exports a list of topic dictionaries to a CSV file with a fixed set of columns."""
     if not data:
         print("No data to export to CSV.")
         return
         
     print(f"Exporting results to {filename}...")
     with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+        # The schema is fixed, so plain tuples avoid DictWriter's per-row field lookups
+        writer = csv.writer(csvfile)
+        writer.writerow(['rank', 'article', 'views', 'aljazeera_coverage'])
+        writer.writerows(
+            (row['rank'], row['article'], row['views'], row['aljazeera_coverage'])
+            for row in data
+        )
     print("CSV file exported successfully.")
 
 
@@ -185,7 +270,168 @@ def load_exclusions_from_file(filepath):
         return EXCLUSION_PATTERNS
 
 
-def main(date_str, top_n, exclusion_file=None, custom_exclusions=None):
+def load_coverage_cache(filepath):
+    """
+    Loads previously checked Al Jazeera coverage results, dropping expired entries.
+    
+    Args:
+        filepath (str): Path to the JSON cache file.
+    
+    Returns:
+        dict: Maps an article title to {'coverage': bool, 'checked': 'YYYY-MM-DD'}.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except orjson.JSONDecodeError as e:
+        print(f"Ignoring unreadable coverage cache '{filepath}': {e}")
+        return {}
+    
+    if not isinstance(cache, dict):
+        print(f"Ignoring unreadable coverage cache '{filepath}': expected a JSON object")
+        return {}
+    
+    oldest = (datetime.now() - COVERAGE_CACHE_MAX_AGE).strftime('%Y-%m-%d')
+    return {
+        title: entry for title, entry in cache.items()
+        # Malformed entries are skipped rather than failing the whole run
+        if isinstance(entry, dict)
+        and isinstance(entry.get('coverage'), bool)
+        and isinstance(entry.get('checked'), str)
+        and entry['checked'] >= oldest
+    }
+
+
+def save_coverage_cache(cache, filepath):
+    """Saves Al Jazeera coverage results to a JSON cache file with UTF-8 encoding."""
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+
+
+def build_firefox_options(cache_dir):
+    """
+    Builds headless Firefox options that cache aggressively on disk and skip
+    loading resources that are not needed to detect search results.
+    
+    Args:
+        cache_dir (str): Directory for the browser's persistent disk cache.
+    
+    Returns:
+        FirefoxOptions: The configured browser options.
+    """
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+    options = FirefoxOptions()
+    options.add_argument("--headless")  # Run in the background without a visible browser window
+    # Return from driver.get() once the DOM is parsed instead of waiting for every subresource
+    options.page_load_strategy = 'eager'
+    # Keep the cache outside the throwaway Selenium profile so it survives between runs
+    options.set_preference("browser.cache.disk.enable", True)
+    options.set_preference("browser.cache.memory.enable", True)
+    options.set_preference("browser.cache.disk.parent_directory", cache_dir)
+    # Only DOM presence of the results markers matters, so skip images, stylesheets and web fonts
+    options.set_preference("permissions.default.image", 2)
+    options.set_preference("permissions.default.stylesheet", 2)
+    options.set_preference("browser.display.use_document_fonts", 0)
+    return options
+
+
+def claim_firefox_cache_dir():
+    """
+    Claims a persistent Firefox cache directory that no other browser is using, including
+    browsers started by other runs of this script.
+    
+    Returns:
+        tuple: (cache_dir, lock_file). The directory stays claimed while lock_file is open.
+            lock_file is None when no persistent directory could be locked and a throwaway
+            temporary directory is returned instead.
+    """
+    if fcntl is not None:
+        os.makedirs(FIREFOX_CACHE_DIR, exist_ok=True)
+        for slot in range(FIREFOX_CACHE_SLOTS):
+            lock_file = open(os.path.join(FIREFOX_CACHE_DIR, f"{slot}.lock"), 'a')
+            try:
+                # The lock is released automatically if the process dies, so it never goes stale
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            return os.path.join(FIREFOX_CACHE_DIR, str(slot)), lock_file
+    return tempfile.mkdtemp(prefix='wikitrend-ffcache-'), None
+
+
+def release_firefox_cache_dirs(cache_claims):
+    """Releases cache directories claimed with claim_firefox_cache_dir()."""
+    for cache_dir, lock_file in cache_claims:
+        if lock_file is None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        else:
+            lock_file.close()
+
+
+def check_coverage_with_selenium(topics, max_browsers=MAX_BROWSERS):
+    """
+    Checks Al Jazeera coverage for each topic using a pool of headless Firefox browsers.
+    
+    Args:
+        topics (list): Topic dictionaries as returned by get_top_wikipedia_arabic_topics.
+        max_browsers (int): Maximum number of browsers searching in parallel, capped at MAX_BROWSERS.
+    
+    Returns:
+        list: One search result per topic, or None if Selenium is not installed or the
+            browsers could not be started.
+    """
+    try:
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+    except ImportError:
+        print("Selenium is not installed. Install it with 'pip install selenium'.")
+        return None
+    
+    # --- Setup Selenium WebDrivers ---
+    # A WebDriver is not thread-safe, so each parallel search borrows its own browser.
+    workers = min(max_browsers, MAX_BROWSERS, len(topics))
+    print(f"\nSetting up {workers} browser(s) for searching Al Jazeera...")
+    
+    drivers = []
+    cache_claims = []
+    try:
+        for _ in range(workers):
+            # Concurrent browsers cannot share one cache directory, so each claims its own
+            cache_claims.append(claim_firefox_cache_dir())
+            drivers.append(webdriver.Firefox(options=build_firefox_options(cache_claims[-1][0])))
+    except WebDriverException as e:
+        print(f"Failed to start browser. Ensure geckodriver is in your PATH and Firefox is installed. Error: {e}")
+        for driver in drivers:
+            driver.quit()
+        release_firefox_cache_dirs(cache_claims)
+        return None
+    
+    available_drivers = queue.Queue()
+    for driver in drivers:
+        available_drivers.put(driver)
+    
+    def search_topic(topic):
+        driver = available_drivers.get()
+        try:
+            return search_aljazeera_with_selenium(topic['article'], driver)
+        finally:
+            available_drivers.put(driver)
+        
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(search_topic, topics))
+    finally:
+        # --- Cleanup ---
+        for driver in drivers:
+            driver.quit()  # Close the browser sessions
+        release_firefox_cache_dirs(cache_claims)
+        print("\nBrowser(s) closed.")
+
+
+def main(date_str, top_n, exclusion_file=None, custom_exclusions=None, use_cache=True, max_workers=None):
     """
     Main function to fetch, search, and save trending topics.
     
@@ -194,6 +440,9 @@ def main(date_str, top_n, exclusion_file=None, custom_exclusions=None):
         top_n (int): Number of top articles to fetch.
         exclusion_file (str): Path to file containing exclusion patterns.
         custom_exclusions (list): Additional exclusion patterns to add.
+        use_cache (bool): Reuse recent Al Jazeera coverage results from previous runs.
+        max_workers (int): Number of browsers searching Al Jazeera in parallel. Defaults to
+            MAX_BROWSERS, which is also the cap.
     """
     # Determine which exclusions to use
     if exclusion_file:
@@ -212,26 +461,36 @@ def main(date_str, top_n, exclusion_file=None, custom_exclusions=None):
         print("Could not retrieve trending topics. Exiting.")
         return
 
-    # --- Setup Selenium WebDriver ---
-    print("\nSetting up the browser for searching Al Jazeera...")
-    options = FirefoxOptions()
-    options.add_argument("--headless")  # Run in the background without a visible browser window
-    
-    try:
-        driver = webdriver.Firefox(options=options)
-    except WebDriverException as e:
-        print(f"Failed to start browser. Ensure geckodriver is in your PATH and Firefox is installed. Error: {e}")
-        return
-        
     # --- Process Topics ---
+    coverage_cache = load_coverage_cache(COVERAGE_CACHE_FILE) if use_cache else {}
+    pending_topics = [topic for topic in trending_topics if topic['article'] not in coverage_cache]
+    results = check_coverage_with_selenium(pending_topics, max_workers or MAX_BROWSERS) if pending_topics else []
+    if results is None:
+        return
+    
+    if len(pending_topics) < len(trending_topics):
+        print(f"Reusing cached Al Jazeera coverage for {len(trending_topics) - len(pending_topics)} topic(s).")
+    
+    today = datetime.now().strftime('%Y-%m-%d')
+    coverage = {title: entry['coverage'] for title, entry in coverage_cache.items()}
+    for topic, coverage_found in zip(pending_topics, results):
+        coverage[topic['article']] = coverage_found
+        # Only confirmed answers are cached; failed and inferred searches are retried next run
+        if coverage_found is True or coverage_found is False:
+            coverage_cache[topic['article']] = {'coverage': coverage_found, 'checked': today}
+    
     for topic in trending_topics:
-        coverage_found = search_aljazeera_with_selenium(topic['article'], driver)
-        topic['aljazeera_coverage'] = "نعم" if coverage_found else "لا"
+        coverage_found = coverage.get(topic['article'])
+        if coverage_found is None:
+            # The search failed, so don't report it as no coverage
+            topic['aljazeera_coverage'] = "غير معروف"
+        else:
+            topic['aljazeera_coverage'] = "لا" if coverage_found is False else "نعم"
     
-    # --- Cleanup and Save ---
-    driver.quit()  # Close the browser session
-    print("\nBrowser closed.")
+    if use_cache:
+        save_coverage_cache(coverage_cache, COVERAGE_CACHE_FILE)
     
+    # --- Save ---
     json_filename = f"trending_{date_str}.json"
     csv_filename = f"trending_{date_str}.csv"
     
@@ -277,7 +536,22 @@ if __name__ == '__main__':
         help="Add a custom exclusion pattern. Can be used multiple times."
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action='store_true',
+        help="Ignore and do not update the cache of Al Jazeera coverage results from previous runs."
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=f"The number of Al Jazeera searches to run in parallel. Each one is a separate headless Firefox, "
+             f"so this is capped at {MAX_BROWSERS}, which is also the default."
+    )
+    
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
     
     # Call the main function with the provided or default arguments
-    main(args.date, args.top_n, args.exclusion_file, args.exclude)
+    main(args.date, args.top_n, args.exclusion_file, args.exclude, not args.no_cache, args.workers)